@@ -1,76 +1,210 @@
-from typing import List, Dict, Any
-from decimal import Decimal
-from statistics import mean, stdev
+from typing import List, Dict, Any, Optional, Tuple, Union
 import logging
+import math
+from bisect import bisect_right
+from functools import lru_cache
+import numpy as np
 from ...domain.entities.stock import Stock
 from ...domain.entities.analysis import Analysis, TrendDirection, RiskLevel
 
 logger = logging.getLogger(__name__)
 
+# Price history as a NumPy array (structured or 1-D closes) or a list of dicts
+HistoricalData = Union[np.ndarray, List[Dict[str, Any]]]
+
+# Lookup tables indexed by computed trend code / risk score
+_TREND_BY_CODE = (None, TrendDirection.UP, TrendDirection.DOWN, TrendDirection.SIDEWAYS)
+_RISK_BY_SCORE = (RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.HIGH)
+
+
+def _above(threshold: float) -> float:
+    """Smallest float greater than threshold, so a strict '> threshold' tier can start there."""
+    return math.nextafter(threshold, math.inf)
+
+
+# Piecewise-constant scoring tables: for breaks b and deltas d, a value v
+# scores d[i] where i = number of breaks <= v (bisect_right / searchsorted).
+# P/E: < 10 potentially undervalued, > 35 potentially overvalued
+_PE_BREAKS = (10.0, 15.0, _above(25.0), _above(35.0))
+_PE_DELTAS = (2, 1, 0, -1, -2)
+# Dividend yield (%): reward dividend-paying stocks
+_YIELD_BREAKS = (_above(3.0), _above(5.0))
+_YIELD_DELTAS = (0, 1, 2)
+# Price change (%)
+_CHANGE_BREAKS = (-10.0, -5.0, _above(5.0), _above(10.0))
+_CHANGE_DELTAS = (-2, -1, 0, 1, 2)
+# Market cap (JPY): smaller companies might have more growth potential
+_CAP_BREAKS = (10_000_000_000.0, _above(1_000_000_000_000.0))  # 10B / 1T JPY
+_CAP_DELTAS = (1, 0, -1)
+
+
+def _tier_delta(value: Optional[float], breaks: Tuple[float, ...], deltas: Tuple[int, ...]) -> int:
+    """Score delta for a single value; missing (None or zero) values score 0."""
+    return deltas[bisect_right(breaks, value)] if value else 0
+
+
+def _tier_deltas(values: np.ndarray, breaks: Tuple[float, ...], deltas: Tuple[int, ...]) -> np.ndarray:
+    """Vectorized _tier_delta over a column where missing values are NaN."""
+    tiers = np.asarray(deltas)[np.searchsorted(breaks, values, side='right')]
+    return np.where(np.isnan(values), 0, tiers)
+
+
+def _column(values) -> np.ndarray:
+    """Build a float64 column, mapping missing (None or zero) values to NaN."""
+    return np.array([float(v) if v else np.nan for v in values], dtype=np.float64)
+
+
+def _closes_array(historical_data: HistoricalData) -> np.ndarray:
+    """Extract closing prices as a contiguous float64 array.
+    
+    Accepts a structured array with a 'close' field, a plain 1-D array of
+    closes, or a list of dicts with a 'close' key.
+    """
+    if isinstance(historical_data, np.ndarray):
+        closes = historical_data['close'] if historical_data.dtype.names else historical_data
+        return np.ascontiguousarray(closes, dtype=np.float64)
+    
+    return np.fromiter(
+        (d.get('close', 0.0) for d in historical_data),
+        dtype=np.float64,
+        count=len(historical_data)
+    )
+
+
+def _wilder_average(values: np.ndarray, period: int) -> float:
+    """Wilder's smoothed average of values (SMA seed, then EMA with alpha=1/period)."""
+    seed = values[:period].mean()
+    tail = values[period:]
+    if tail.size == 0:
+        return float(seed)
+    
+    # Unrolled recursion avg = (avg * (period - 1) + x) / period over the tail
+    decay = 1.0 - 1.0 / period
+    weights = decay ** np.arange(tail.size - 1, -1, -1, dtype=np.float64)
+    return float(seed * decay ** tail.size + (weights @ tail) / period)
+
+
+def _rsi(closes: np.ndarray, period: int) -> float:
+    """RSI of a close series, rounded to two decimals."""
+    if closes.size < period + 1:
+        return 50.0  # Neutral RSI
+    
+    delta = np.diff(closes)
+    avg_gain = _wilder_average(np.clip(delta, 0.0, None), period)
+    avg_loss = _wilder_average(np.clip(-delta, 0.0, None), period)
+    
+    if avg_loss == 0:
+        return 100.0
+    
+    rs = avg_gain / avg_loss
+    return round(100 - (100 / (1 + rs)), 2)
+
+
+def _compute_indicators(
+    closes: np.ndarray, period: int = 14
+) -> Tuple[float, Optional[float], Optional[float], Optional[float]]:
+    """Compute (rsi, volatility, ma_5d, ma_20d) from a close series in one call."""
+    rsi = _rsi(closes, period)
+    volatility = ma_5d = ma_20d = None
+    
+    prev, curr = closes[:-1], closes[1:]
+    valid = prev > 0
+    returns = (curr[valid] - prev[valid]) / prev[valid] * 100
+    
+    if returns.size:
+        # Sample standard deviation needs at least two returns
+        if returns.size > 1:
+            volatility = float(returns.std(ddof=1))
+        if closes.size >= 5:
+            ma_5d = float(closes[-5:].mean())
+        if closes.size >= 20:
+            ma_20d = float(closes[-20:].mean())
+    
+    return rsi, volatility, ma_5d, ma_20d
+
+
+# The scoring and indicator functions below are pure, so results are memoized
+# for repeated analyses of unchanged inputs (bounded to cap memory use).
+
+@lru_cache(maxsize=1024)
+def _cached_indicators(
+    closes_key: bytes, period: int = 14
+) -> Tuple[float, Optional[float], Optional[float], Optional[float]]:
+    """_compute_indicators keyed on the raw bytes of a float64 close array."""
+    return _compute_indicators(np.frombuffer(closes_key, dtype=np.float64), period)
+
+
+@lru_cache(maxsize=4096)
+def _valuation_score(pe_ratio: Optional[float], dividend_yield: Optional[float]) -> int:
+    """Valuation score (1-10) from P/E ratio and dividend yield."""
+    score = (
+        5  # Neutral starting point
+        + _tier_delta(pe_ratio, _PE_BREAKS, _PE_DELTAS)
+        + _tier_delta(dividend_yield, _YIELD_BREAKS, _YIELD_DELTAS)
+    )
+    return max(1, min(10, score))
+
+
+@lru_cache(maxsize=4096)
+def _growth_score(price_change_percent: Optional[float], market_cap: Optional[int]) -> int:
+    """Growth potential score (1-10) from price change and market cap."""
+    score = (
+        5  # Neutral starting point
+        + _tier_delta(price_change_percent, _CHANGE_BREAKS, _CHANGE_DELTAS)
+        + _tier_delta(market_cap, _CAP_BREAKS, _CAP_DELTAS)
+    )
+    return max(1, min(10, score))
+
 
 class SimpleAnalysisEngine:
     """Simple analysis engine for basic stock analysis."""
     
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-    
-    def analyze_stock(self, stock: Stock, historical_data: List[Dict[str, Any]] = None) -> Analysis:
+    def analyze_stock(self, stock: Stock, historical_data: Optional[HistoricalData] = None) -> Analysis:
         """Perform basic analysis on a single stock."""
-        analysis = Analysis(stock_symbol=stock.symbol)
+        # Results are collected first so the model is validated once, rather
+        # than paying Pydantic's __setattr__ overhead for every field.
+        fields: Dict[str, Any] = {}
         
         try:
             # Basic trend analysis based on price change
-            if stock.price_change_percent:
-                analysis.daily_return = stock.price_change_percent
+            change = stock.price_change_percent
+            if change:
+                fields['daily_return'] = change
                 
-                if stock.price_change_percent > 2:
-                    analysis.trend_direction = TrendDirection.UP
-                elif stock.price_change_percent < -2:
-                    analysis.trend_direction = TrendDirection.DOWN
+                if change > 2:
+                    fields['trend_direction'] = TrendDirection.UP
+                elif change < -2:
+                    fields['trend_direction'] = TrendDirection.DOWN
                 else:
-                    analysis.trend_direction = TrendDirection.SIDEWAYS
+                    fields['trend_direction'] = TrendDirection.SIDEWAYS
             
-            # Calculate volatility (simplified)
-            if historical_data and len(historical_data) > 1:
-                returns = []
-                for i in range(1, len(historical_data)):
-                    prev_price = historical_data[i-1].get('close', 0)
-                    curr_price = historical_data[i].get('close', 0)
-                    if prev_price > 0:
-                        daily_return = ((curr_price - prev_price) / prev_price) * 100
-                        returns.append(daily_return)
-                
-                if returns:
-                    analysis.volatility = Decimal(str(stdev(returns)))
-                    
-                    # Calculate moving averages
-                    if len(historical_data) >= 5:
-                        recent_5 = historical_data[-5:]
-                        analysis.moving_average_5d = Decimal(str(mean([d.get('close', 0) for d in recent_5])))
-                    
-                    if len(historical_data) >= 20:
-                        recent_20 = historical_data[-20:]
-                        analysis.moving_average_20d = Decimal(str(mean([d.get('close', 0) for d in recent_20])))
-            
-            # Simple RSI calculation (simplified version)
-            analysis.rsi = self._calculate_simple_rsi(historical_data) if historical_data else None
+            # Technical indicators (RSI, volatility, moving averages)
+            if historical_data is not None and len(historical_data):
+                closes = _closes_array(historical_data)
+                (
+                    fields['rsi'],
+                    fields['volatility'],
+                    fields['moving_average_5d'],
+                    fields['moving_average_20d']
+                ) = _cached_indicators(closes.tobytes())
             
             # Basic valuation scoring
-            analysis.valuation_score = self._calculate_valuation_score(stock)
+            fields['valuation_score'] = self._calculate_valuation_score(stock)
             
             # Growth potential (simplified)
-            analysis.growth_potential = self._calculate_growth_potential(stock)
+            fields['growth_potential'] = self._calculate_growth_potential(stock)
             
             # Risk assessment
-            analysis.risk_level = self._assess_risk_level(stock, analysis)
-            analysis.risk_factors = self._identify_risk_factors(stock, analysis)
+            volatility = fields.get('volatility')
+            fields['risk_level'] = self._assess_risk_level(stock, volatility)
+            fields['risk_factors'] = self._identify_risk_factors(stock, volatility, fields.get('rsi'))
             
             logger.info(f"Analysis completed for {stock.symbol}")
             
         except Exception as e:
             logger.error(f"Error analyzing stock {stock.symbol}: {str(e)}")
         
-        return analysis
+        return Analysis(stock_symbol=stock.symbol, **fields)
     
     def analyze_multiple_stocks(self, stocks: List[Stock]) -> List[Analysis]:
         """Analyze multiple stocks."""
@@ -82,137 +216,100 @@ class SimpleAnalysisEngine:
         logger.info(f"Completed analysis for {len(analyses)} stocks")
         return analyses
     
-    def _calculate_simple_rsi(self, historical_data: List[Dict[str, Any]], period: int = 14) -> Decimal:
-        """Calculate a simplified RSI."""
-        if not historical_data or len(historical_data) < period + 1:
-            return Decimal('50')  # Neutral RSI
+    def analyze_multiple_stocks_batched(self, stocks: List[Stock]) -> List[Analysis]:
+        """Analyze multiple stocks with vectorized scoring over column arrays.
         
-        gains = []
-        losses = []
+        Produces the same results as analyze_multiple_stocks without historical data.
+        """
+        if not stocks:
+            return []
         
-        for i in range(1, min(len(historical_data), period + 1)):
-            prev_price = historical_data[i-1].get('close', 0)
-            curr_price = historical_data[i].get('close', 0)
-            change = curr_price - prev_price
-            
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
+        pcp = _column(s.price_change_percent for s in stocks)
+        pe = _column(s.pe_ratio for s in stocks)
+        dy = _column(s.dividend_yield for s in stocks)
+        cap = _column(s.market_cap for s in stocks)
         
-        if not gains or not losses:
-            return Decimal('50')
+        trend = np.select([pcp > 2, pcp < -2, ~np.isnan(pcp)], [1, 2, 3], default=0)
         
-        avg_gain = mean(gains) if gains else 0
-        avg_loss = mean(losses) if losses else 0
+        valuation = 5 + _tier_deltas(pe, _PE_BREAKS, _PE_DELTAS) + _tier_deltas(dy, _YIELD_BREAKS, _YIELD_DELTAS)
+        growth = (
+            5
+            + _tier_deltas(pcp, _CHANGE_BREAKS, _CHANGE_DELTAS)
+            + _tier_deltas(cap, _CAP_BREAKS, _CAP_DELTAS)
+        )
+        risk = ((pe > 30) | (pe < 5)).astype(np.int64) + (np.abs(pcp) > 10)
         
-        if avg_loss == 0:
-            return Decimal('100')
+        analyses = [
+            Analysis(
+                stock_symbol=stock.symbol,
+                trend_direction=_TREND_BY_CODE[t],
+                daily_return=stock.price_change_percent or None,
+                valuation_score=v,
+                growth_potential=g,
+                risk_level=_RISK_BY_SCORE[r],
+                risk_factors=self._identify_risk_factors(stock, None, None)
+            )
+            for stock, t, v, g, r in zip(
+                stocks,
+                trend.tolist(),
+                np.clip(valuation, 1, 10).tolist(),
+                np.clip(growth, 1, 10).tolist(),
+                risk.tolist()
+            )
+        ]
         
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
+        logger.info(f"Completed batched analysis for {len(analyses)} stocks")
+        return analyses
+    
+    def _calculate_simple_rsi(self, historical_data: Optional[HistoricalData], period: int = 14) -> float:
+        """Calculate RSI using Wilder's smoothing."""
+        if historical_data is None or not len(historical_data):
+            return 50.0  # Neutral RSI
         
-        return Decimal(str(round(rsi, 2)))
+        return _cached_indicators(_closes_array(historical_data).tobytes(), period)[0]
     
     def _calculate_valuation_score(self, stock: Stock) -> int:
         """Calculate a simple valuation score (1-10)."""
-        score = 5  # Neutral starting point
-        
         try:
-            if stock.pe_ratio:
-                # Adjust score based on P/E ratio
-                if stock.pe_ratio < 10:
-                    score += 2  # Potentially undervalued
-                elif stock.pe_ratio < 15:
-                    score += 1
-                elif stock.pe_ratio > 25:
-                    score -= 1
-                elif stock.pe_ratio > 35:
-                    score -= 2  # Potentially overvalued
-            
-            if stock.dividend_yield:
-                # Reward dividend-paying stocks
-                if stock.dividend_yield > 3:
-                    score += 1
-                elif stock.dividend_yield > 5:
-                    score += 2
-            
-            # Ensure score is within bounds
-            score = max(1, min(10, score))
-            
+            return _valuation_score(
+                float(stock.pe_ratio) if stock.pe_ratio else None,
+                float(stock.dividend_yield) if stock.dividend_yield else None
+            )
         except Exception as e:
             logger.warning(f"Error calculating valuation score for {stock.symbol}: {str(e)}")
-            score = 5
-        
-        return score
+            return 5
     
     def _calculate_growth_potential(self, stock: Stock) -> int:
         """Calculate growth potential score (1-10)."""
-        score = 5  # Neutral starting point
-        
         try:
-            # Simple heuristics for growth potential
-            if stock.price_change_percent:
-                if stock.price_change_percent > 5:
-                    score += 1
-                elif stock.price_change_percent > 10:
-                    score += 2
-                elif stock.price_change_percent < -5:
-                    score -= 1
-                elif stock.price_change_percent < -10:
-                    score -= 2
-            
-            # Market cap considerations (smaller companies might have more growth potential)
-            if stock.market_cap:
-                if stock.market_cap < 10_000_000_000:  # < 10B JPY
-                    score += 1
-                elif stock.market_cap > 1_000_000_000_000:  # > 1T JPY
-                    score -= 1
-            
-            # Ensure score is within bounds
-            score = max(1, min(10, score))
-            
+            return _growth_score(stock.price_change_percent, stock.market_cap)
         except Exception as e:
             logger.warning(f"Error calculating growth potential for {stock.symbol}: {str(e)}")
-            score = 5
-        
-        return score
+            return 5
     
-    def _assess_risk_level(self, stock: Stock, analysis: Analysis) -> RiskLevel:
+    def _assess_risk_level(self, stock: Stock, volatility: Optional[float]) -> RiskLevel:
         """Assess overall risk level."""
-        risk_score = 0
-        
-        # High volatility increases risk
-        if analysis.volatility and analysis.volatility > 5:
-            risk_score += 1
-        if analysis.volatility and analysis.volatility > 10:
-            risk_score += 1
-        
-        # Extreme P/E ratios increase risk
-        if stock.pe_ratio:
-            if stock.pe_ratio > 30 or stock.pe_ratio < 5:
-                risk_score += 1
-        
-        # Large price movements increase risk
-        if stock.price_change_percent:
-            if abs(stock.price_change_percent) > 10:
-                risk_score += 1
-        
-        # Determine risk level
-        if risk_score >= 3:
-            return RiskLevel.HIGH
-        elif risk_score >= 1:
-            return RiskLevel.MEDIUM
-        else:
-            return RiskLevel.LOW
-    
-    def _identify_risk_factors(self, stock: Stock, analysis: Analysis) -> List[str]:
+        volatility = volatility or 0.0
+        change = stock.price_change_percent or 0.0
+        pe_ratio = stock.pe_ratio
+        
+        # Each risk condition adds one point: high volatility (two tiers),
+        # extreme P/E ratio and large price movement
+        risk_score = (
+            (volatility > 5)
+            + (volatility > 10)
+            + bool(pe_ratio and (pe_ratio > 30 or pe_ratio < 5))
+            + (abs(change) > 10)
+        )
+        return _RISK_BY_SCORE[risk_score]
+    
+    def _identify_risk_factors(
+        self, stock: Stock, volatility: Optional[float], rsi: Optional[float]
+    ) -> List[str]:
         """Identify specific risk factors."""
         factors = []
         
-        if analysis.volatility and analysis.volatility > 8:
+        if volatility and volatility > 8:
             factors.append("High price volatility")
         
         if stock.pe_ratio and stock.pe_ratio > 35:
@@ -221,9 +318,9 @@ class SimpleAnalysisEngine:
         if stock.price_change_percent and stock.price_change_percent < -15:
             factors.append("Significant recent price decline")
         
-        if analysis.rsi and analysis.rsi > 80:
+        if rsi and rsi > 80:
             factors.append("Overbought conditions (RSI > 80)")
-        elif analysis.rsi and analysis.rsi < 20:
+        elif rsi and rsi < 20:
             factors.append("Oversold conditions (RSI < 20)")
         
         if not stock.dividend_yield or stock.dividend_yield < 1:
@@ -1,57 +1,100 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+from dataclasses import dataclass, field
 from datetime import datetime
+import heapq
+from operator import attrgetter
 import uuid
 import logging
 from ...domain.entities.stock import Stock
-from ...domain.entities.analysis import Analysis
+from ...domain.entities.analysis import Analysis, RiskLevel
 from ...domain.entities.summary import Summary, SummaryType, InsightLevel
 
 logger = logging.getLogger(__name__)
 
+# Number of top gainers/losers tracked for the daily overview
+_TOP_MOVERS = 3
+
+# Sort key for top gainers/losers
+_price_change = attrgetter('price_change_percent')
+
+# Executive summary templates
+_MARKET_EXECUTIVE_SUMMARY = (
+    "Market Overview: {positive}/{total} stocks gained today, while {negative} declined.\n"
+    "Top gainer: {gainer_name} (+{gainer_change:.2f}%)\n"
+    "Top loser: {loser_name} ({loser_change:.2f}%)"
+)
+_STOCK_EXECUTIVE_SUMMARY = (
+    "{name} ({symbol}) closed at ¥{price} ({change}).\n"
+    "Current trend: {trend}. Risk level: {risk}."
+)
+
+
+@dataclass(slots=True)
+class MarketContext:
+    """Market statistics aggregated once per daily overview and shared by its helpers."""
+    
+    total: int = 0
+    positive: int = 0
+    negative: int = 0
+    change_sum: float = 0.0
+    total_volume: int = 0
+    pe_sum: float = 0.0
+    pe_count: int = 0
+    positive_symbols: List[str] = field(default_factory=list)
+    negative_symbols: List[str] = field(default_factory=list)
+    high_performer_names: List[str] = field(default_factory=list)
+    top_gainers: List[Stock] = field(default_factory=list)
+    top_losers: List[Stock] = field(default_factory=list)
+    high_vol_symbols: List[str] = field(default_factory=list)
+    extreme_vol_count: int = 0
+    high_risk_count: int = 0
+    
+    @property
+    def average_change(self) -> float:
+        """Average price change across all stocks (missing changes count as 0)."""
+        return self.change_sum / self.total if self.total else 0.0
+    
+    @property
+    def average_pe(self) -> Optional[float]:
+        """Average P/E ratio over stocks that report one."""
+        return self.pe_sum / self.pe_count if self.pe_count else None
+
 
 class SummaryService:
     """Service for generating summaries from stock analysis."""
     
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-    
     def generate_daily_overview(self, stocks: List[Stock], analyses: List[Analysis]) -> Summary:
         """Generate a daily market overview summary."""
-        summary_id = str(uuid.uuid4())
-        
-        # Calculate key metrics
-        total_stocks = len(stocks)
-        positive_stocks = len([s for s in stocks if s.price_change_percent and s.price_change_percent > 0])
-        negative_stocks = len([s for s in stocks if s.price_change_percent and s.price_change_percent < 0])
-        
-        # Find top performers
-        top_gainers = sorted(
-            [s for s in stocks if s.price_change_percent], 
-            key=lambda x: x.price_change_percent, 
-            reverse=True
-        )[:3]
+        summary_id = uuid.uuid4().hex
         
-        top_losers = sorted(
-            [s for s in stocks if s.price_change_percent], 
-            key=lambda x: x.price_change_percent
-        )[:3]
+        # Calculate key metrics in a single pass
+        ctx = self._build_market_context(stocks, analyses)
+        total_stocks = ctx.total
+        positive_stocks = ctx.positive
+        negative_stocks = ctx.negative
+        top_gainers = ctx.top_gainers
+        top_losers = ctx.top_losers
         
         # Create executive summary
-        executive_summary = f"""
-        Market Overview: {positive_stocks}/{total_stocks} stocks gained today, while {negative_stocks} declined.
-        Top gainer: {top_gainers[0].name} (+{top_gainers[0].price_change_percent:.2f}%)
-        Top loser: {top_losers[0].name} ({top_losers[0].price_change_percent:.2f}%)
-        """.strip()
+        executive_summary = _MARKET_EXECUTIVE_SUMMARY.format(
+            positive=positive_stocks,
+            total=total_stocks,
+            negative=negative_stocks,
+            gainer_name=top_gainers[0].name,
+            gainer_change=top_gainers[0].price_change_percent,
+            loser_name=top_losers[0].name,
+            loser_change=top_losers[0].price_change_percent
+        )
         
         # Create detailed analysis
-        detailed_analysis = self._create_detailed_market_analysis(stocks, analyses)
+        detailed_analysis = self._create_detailed_market_analysis(ctx)
         
         # Key metrics
         key_metrics = {
             "Total Stocks Analyzed": str(total_stocks),
             "Stocks Up": str(positive_stocks),
             "Stocks Down": str(negative_stocks),
-            "Average Change": f"{sum(s.price_change_percent or 0 for s in stocks) / total_stocks:.2f}%",
+            "Average Change": f"{ctx.average_change:.2f}%",
             "Market Sentiment": "Positive" if positive_stocks > negative_stocks else "Negative"
         }
         
@@ -69,26 +112,30 @@ class SummaryService:
         )
         
         # Add insights
-        self._add_market_insights(summary, stocks, analyses)
+        self._add_market_insights(summary, ctx)
         
         # Add recommendations
-        summary.recommendations = self._generate_market_recommendations(stocks, analyses)
+        summary.recommendations = self._generate_market_recommendations(ctx)
         
         logger.info(f"Generated daily overview summary for {total_stocks} stocks")
         return summary
     
     def generate_stock_analysis_summary(self, stock: Stock, analysis: Analysis) -> Summary:
         """Generate a detailed summary for a single stock."""
-        summary_id = str(uuid.uuid4())
+        summary_id = uuid.uuid4().hex
         
         # Executive summary
         change_text = f"+{analysis.daily_return:.2f}%" if analysis.daily_return and analysis.daily_return > 0 else f"{analysis.daily_return:.2f}%"
         trend_text = analysis.trend_direction.value if analysis.trend_direction else "sideways"
         
-        executive_summary = f"""
-        {stock.name} ({stock.symbol}) closed at ¥{stock.current_price} ({change_text}).
-        Current trend: {trend_text}. Risk level: {analysis.risk_level.value if analysis.risk_level else 'medium'}.
-        """.strip()
+        executive_summary = _STOCK_EXECUTIVE_SUMMARY.format(
+            name=stock.name,
+            symbol=stock.symbol,
+            price=stock.current_price,
+            change=change_text,
+            trend=trend_text,
+            risk=analysis.risk_level.value if analysis.risk_level else 'medium'
+        )
         
         # Detailed analysis
         detailed_analysis = self._create_detailed_stock_analysis(stock, analysis)
@@ -100,7 +147,7 @@ class SummaryService:
             "P/E Ratio": str(stock.pe_ratio) if stock.pe_ratio else "N/A",
             "Market Cap": f"¥{stock.market_cap:,}" if stock.market_cap else "N/A",
             "Risk Level": analysis.risk_level.value if analysis.risk_level else "N/A",
-            "RSI": str(analysis.rsi) if analysis.rsi else "N/A"
+            "RSI": str(analysis.to_display()["rsi"]) if analysis.rsi else "N/A"
         }
         
         # Create summary
@@ -125,46 +172,91 @@ class SummaryService:
         logger.info(f"Generated analysis summary for {stock.symbol}")
         return summary
     
-    def _create_detailed_market_analysis(self, stocks: List[Stock], analyses: List[Analysis]) -> str:
+    def _build_market_context(self, stocks: List[Stock], analyses: List[Analysis]) -> MarketContext:
+        """Aggregate market statistics with one pass over stocks and one over analyses."""
+        ctx = MarketContext(total=len(stocks))
+        movers = []
+        
+        for stock in stocks:
+            ctx.total_volume += stock.volume or 0
+            if stock.pe_ratio:
+                ctx.pe_sum += float(stock.pe_ratio)
+                ctx.pe_count += 1
+            
+            change = stock.price_change_percent
+            if not change:
+                continue
+            
+            ctx.change_sum += change
+            if change > 0:
+                ctx.positive += 1
+                ctx.positive_symbols.append(stock.symbol)
+                if change > 5:
+                    ctx.high_performer_names.append(stock.name)
+            else:
+                ctx.negative += 1
+                ctx.negative_symbols.append(stock.symbol)
+            
+            movers.append(stock)
+        
+        # nlargest/nsmallest keep input order on ties, matching a stable sort
+        ctx.top_gainers = heapq.nlargest(_TOP_MOVERS, movers, key=_price_change)
+        ctx.top_losers = heapq.nsmallest(_TOP_MOVERS, movers, key=_price_change)
+        
+        for analysis in analyses:
+            volatility = analysis.volatility
+            if volatility and volatility > 8:
+                ctx.high_vol_symbols.append(analysis.stock_symbol)
+                if volatility > 10:
+                    ctx.extreme_vol_count += 1
+            if analysis.risk_level is RiskLevel.HIGH:
+                ctx.high_risk_count += 1
+        
+        return ctx
+    
+    def _create_detailed_market_analysis(self, ctx: MarketContext) -> str:
         """Create detailed market analysis text."""
         analysis_parts = []
         
         # Market performance
-        total_volume = sum(s.volume or 0 for s in stocks)
-        avg_pe = sum(float(s.pe_ratio) for s in stocks if s.pe_ratio) / len([s for s in stocks if s.pe_ratio])
-        
-        analysis_parts.append(f"Market Activity: Total volume of {total_volume:,} shares traded.")
-        analysis_parts.append(f"Average P/E ratio across analyzed stocks: {avg_pe:.2f}")
+        analysis_parts.append(f"Market Activity: Total volume of {ctx.total_volume:,} shares traded.")
+        avg_pe = ctx.average_pe
+        if avg_pe is not None:
+            analysis_parts.append(f"Average P/E ratio across analyzed stocks: {avg_pe:.2f}")
         
         # Sector performance (simplified)
-        high_performers = [s for s in stocks if s.price_change_percent and s.price_change_percent > 5]
-        if high_performers:
-            analysis_parts.append(f"Strong performers: {', '.join([s.name for s in high_performers])}")
+        if ctx.high_performer_names:
+            analysis_parts.append(f"Strong performers: {', '.join(ctx.high_performer_names)}")
         
         # Risk assessment
-        high_risk_count = len([a for a in analyses if a.risk_level and a.risk_level.value == 'high'])
-        if high_risk_count > 0:
-            analysis_parts.append(f"Risk Alert: {high_risk_count} stocks identified as high risk.")
+        if ctx.high_risk_count > 0:
+            analysis_parts.append(f"Risk Alert: {ctx.high_risk_count} stocks identified as high risk.")
         
         return "\n\n".join(analysis_parts)
     
     def _create_detailed_stock_analysis(self, stock: Stock, analysis: Analysis) -> str:
         """Create detailed analysis for a single stock."""
         analysis_parts = []
+        change = stock.price_change_percent
+        pe_ratio = stock.pe_ratio
+        ma_5d = analysis.moving_average_5d
+        ma_20d = analysis.moving_average_20d
         
         # Price analysis
-        if stock.price_change_percent:
-            analysis_parts.append(f"Price Movement: {stock.name} moved {stock.price_change_percent:+.2f}% today.")
+        if change:
+            analysis_parts.append(f"Price Movement: {stock.name} moved {change:+.2f}% today.")
         
         # Technical analysis
-        if analysis.moving_average_5d and analysis.moving_average_20d:
-            ma_comparison = "above" if analysis.moving_average_5d > analysis.moving_average_20d else "below"
-            analysis_parts.append(f"Technical: 5-day MA is {ma_comparison} 20-day MA, indicating {analysis.trend_direction.value if analysis.trend_direction else 'neutral'} momentum.")
+        if ma_5d and ma_20d:
+            ma_comparison = "above" if ma_5d > ma_20d else "below"
+            momentum = analysis.trend_direction.value if analysis.trend_direction else 'neutral'
+            analysis_parts.append(f"Technical: 5-day MA is {ma_comparison} 20-day MA, indicating {momentum} momentum.")
         
         # Fundamental analysis
-        if stock.pe_ratio:
-            valuation_text = "undervalued" if stock.pe_ratio < 15 else "overvalued" if stock.pe_ratio > 25 else "fairly valued"
-            analysis_parts.append(f"Valuation: P/E ratio of {stock.pe_ratio} suggests the stock may be {valuation_text}.")
+        if pe_ratio:
+            pe_value = float(pe_ratio)
+            valuation_text = "undervalued" if pe_value < 15 else "overvalued" if pe_value > 25 else "fairly valued"
+            analysis_parts.append(f"Valuation: P/E ratio of {pe_ratio} suggests the stock may be {valuation_text}.")
         
         # Risk factors
         if analysis.risk_factors:
@@ -172,39 +264,31 @@ class SummaryService:
         
         return "\n\n".join(analysis_parts)
     
-    def _add_market_insights(self, summary: Summary, stocks: List[Stock], analyses: List[Analysis]):
+    def _add_market_insights(self, summary: Summary, ctx: MarketContext):
         """Add insights to market summary."""
         # Market trend insight
-        positive_count = len([s for s in stocks if s.price_change_percent and s.price_change_percent > 0])
-        total_count = len(stocks)
-        
-        if positive_count > total_count * 0.7:
+        if ctx.positive > ctx.total * 0.7:
             summary.add_insight(
                 InsightLevel.INFO,
                 "Strong Market Performance",
                 f"Over 70% of analyzed stocks showed positive performance today.",
-                [s.symbol for s in stocks if s.price_change_percent and s.price_change_percent > 0]
+                ctx.positive_symbols
             )
-        elif positive_count < total_count * 0.3:
+        elif ctx.positive < ctx.total * 0.3:
             summary.add_insight(
                 InsightLevel.WARNING,
                 "Market Weakness",
                 f"Less than 30% of analyzed stocks showed positive performance today.",
-                [s.symbol for s in stocks if s.price_change_percent and s.price_change_percent < 0]
+                ctx.negative_symbols
             )
         
         # High volatility alert
-        high_vol_stocks = []
-        for analysis in analyses:
-            if analysis.volatility and analysis.volatility > 8:
-                high_vol_stocks.append(analysis.stock_symbol)
-        
-        if high_vol_stocks:
+        if ctx.high_vol_symbols:
             summary.add_insight(
                 InsightLevel.WARNING,
                 "High Volatility Alert",
-                f"Several stocks showing elevated volatility: {', '.join(high_vol_stocks)}",
-                high_vol_stocks,
+                f"Several stocks showing elevated volatility: {', '.join(ctx.high_vol_symbols)}",
+                ctx.high_vol_symbols,
                 0.9
             )
     
@@ -240,27 +324,22 @@ class SummaryService:
                 0.9
             )
     
-    def _generate_market_recommendations(self, stocks: List[Stock], analyses: List[Analysis]) -> List[str]:
+    def _generate_market_recommendations(self, ctx: MarketContext) -> List[str]:
         """Generate market-level recommendations."""
         recommendations = []
         
         # Market sentiment
-        positive_count = len([s for s in stocks if s.price_change_percent and s.price_change_percent > 0])
-        total_count = len(stocks)
-        
-        if positive_count > total_count * 0.6:
+        if ctx.positive > ctx.total * 0.6:
             recommendations.append("Market showing positive momentum - consider increasing equity exposure")
-        elif positive_count < total_count * 0.4:
+        elif ctx.positive < ctx.total * 0.4:
             recommendations.append("Market weakness detected - consider defensive positioning")
         
         # High volatility stocks
-        high_vol_analyses = [a for a in analyses if a.volatility and a.volatility > 10]
-        if high_vol_analyses:
+        if ctx.extreme_vol_count:
             recommendations.append("Several stocks showing high volatility - use smaller position sizes")
         
         # Risk management
-        high_risk_count = len([a for a in analyses if a.risk_level and a.risk_level.value == 'high'])
-        if high_risk_count > total_count * 0.3:
+        if ctx.high_risk_count > ctx.total * 0.3:
             recommendations.append("Elevated risk levels detected - review portfolio risk management")
         
         return recommendations
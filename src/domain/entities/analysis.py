@@ -27,10 +27,10 @@ class Analysis(BaseModel):
     
     # Technical Analysis
     trend_direction: Optional[TrendDirection] = Field(None, description="Overall trend direction")
-    volatility: Optional[Decimal] = Field(None, description="Price volatility percentage")
-    moving_average_5d: Optional[Decimal] = Field(None, description="5-day moving average")
-    moving_average_20d: Optional[Decimal] = Field(None, description="20-day moving average")
-    rsi: Optional[Decimal] = Field(None, description="Relative Strength Index")
+    volatility: Optional[float] = Field(None, description="Price volatility percentage")
+    moving_average_5d: Optional[float] = Field(None, description="5-day moving average")
+    moving_average_20d: Optional[float] = Field(None, description="20-day moving average")
+    rsi: Optional[float] = Field(None, description="Relative Strength Index")
     
     # Fundamental Analysis
     valuation_score: Optional[int] = Field(None, ge=1, le=10, description="Valuation score (1-10)")
@@ -41,17 +41,34 @@ class Analysis(BaseModel):
     risk_factors: list[str] = Field(default_factory=list, description="Identified risk factors")
     
     # Performance Metrics
-    daily_return: Optional[Decimal] = Field(None, description="Daily return percentage")
-    weekly_return: Optional[Decimal] = Field(None, description="Weekly return percentage")
-    monthly_return: Optional[Decimal] = Field(None, description="Monthly return percentage")
+    daily_return: Optional[float] = Field(None, description="Daily return percentage")
+    weekly_return: Optional[float] = Field(None, description="Weekly return percentage")
+    monthly_return: Optional[float] = Field(None, description="Monthly return percentage")
     
     # Additional Metrics
-    beta: Optional[Decimal] = Field(None, description="Beta coefficient vs market")
-    sharpe_ratio: Optional[Decimal] = Field(None, description="Risk-adjusted return metric")
+    beta: Optional[float] = Field(None, description="Beta coefficient vs market")
+    sharpe_ratio: Optional[float] = Field(None, description="Risk-adjusted return metric")
     
     # Raw data for calculations
     raw_data: Dict[str, Any] = Field(default_factory=dict, description="Raw analysis data")
     
+    def to_display(self) -> Dict[str, Optional[Decimal]]:
+        """Get numeric metrics rounded to two decimals for formatting."""
+        return {
+            name: Decimal(f"{value:.2f}") if value is not None else None
+            for name, value in (
+                ("volatility", self.volatility),
+                ("moving_average_5d", self.moving_average_5d),
+                ("moving_average_20d", self.moving_average_20d),
+                ("rsi", self.rsi),
+                ("daily_return", self.daily_return),
+                ("weekly_return", self.weekly_return),
+                ("monthly_return", self.monthly_return),
+                ("beta", self.beta),
+                ("sharpe_ratio", self.sharpe_ratio),
+            )
+        }
+    
     def get_trend_strength(self) -> str:
         """Get human-readable trend strength."""
         if not self.volatility:
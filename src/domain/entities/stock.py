@@ -1,12 +1,16 @@
 from datetime import datetime
+from functools import cached_property
 from decimal import Decimal
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Stock(BaseModel):
     """Stock entity representing a Japanese stock."""
     
+    # Frozen so cached properties cannot go stale through field assignment
+    model_config = ConfigDict(frozen=True)
+    
     symbol: str = Field(..., description="Stock symbol (e.g., '7203.T' for Toyota)")
     name: str = Field(..., description="Company name")
     current_price: Optional[Decimal] = Field(None, description="Current stock price in JPY")
@@ -24,12 +28,20 @@ class Stock(BaseModel):
             return self.current_price - self.previous_close
         return None
     
-    @property
-    def price_change_percent(self) -> Optional[Decimal]:
-        """Calculate percentage price change."""
+    @cached_property
+    def price_change_percent(self) -> Optional[float]:
+        """Calculate percentage price change (computed once per instance; stocks are immutable)."""
         if self.current_price and self.previous_close and self.previous_close > 0:
-            return ((self.current_price - self.previous_close) / self.previous_close) * 100
+            return float(((self.current_price - self.previous_close) / self.previous_close) * 100)
         return None
     
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "Stock":
+        """Copy the stock, dropping cached properties when fields are updated."""
+        copied = super().model_copy(update=update, deep=deep)
+        if update:
+            # model_copy copies __dict__, where cached_property keeps its value
+            copied.__dict__.pop('price_change_percent', None)
+        return copied
+    
     def __str__(self) -> str:
         return f"{self.name} ({self.symbol}): ¥{self.current_price}"
\ No newline at end of file
@@ -1,5 +1,6 @@
 """Infrastructure data sources package."""
 
+from .file_cache import FileSystemCache
 from .yahoo_finance import YahooFinanceCollector
 
-__all__ = ["YahooFinanceCollector"]
\ No newline at end of file
+__all__ = ["FileSystemCache", "YahooFinanceCollector"]
\ No newline at end of file
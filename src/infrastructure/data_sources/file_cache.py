@@ -0,0 +1,74 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "sample-ai-agent" / "yf"
+
+
+class FileSystemCache:
+    """Pickle-backed on-disk cache with a time-to-live per entry."""
+    
+    def __init__(self, cache_dir: Optional[Path] = None, ttl_seconds: float = 900):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.ttl_seconds = ttl_seconds
+        self._pruned = False
+    
+    def _path(self, key: Tuple[str, ...]) -> Path:
+        """Map a key to its cache file."""
+        digest = hashlib.sha256("\x1f".join(key).encode()).hexdigest()
+        return self.cache_dir / f"{digest}.pkl"
+    
+    def get(self, key: Tuple[str, ...]) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                return None
+            with path.open('rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Error reading cache entry {path.name}: {str(e)}")
+            return None
+    
+    def set(self, key: Tuple[str, ...], value: Any) -> None:
+        """Store a value, replacing any existing entry atomically."""
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open('wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Error writing cache entry {path.name}: {str(e)}")
+            tmp_path.unlink(missing_ok=True)
+        
+        # Keys are dated, so entries are never overwritten once a day passes
+        if not self._pruned:
+            self._pruned = True
+            self.prune_expired()
+    
+    def prune_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        removed = 0
+        cutoff = time.time() - self.ttl_seconds
+        try:
+            for path in self.cache_dir.glob("*.pkl"):
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        except Exception as e:
+            logger.warning(f"Error pruning cache directory {self.cache_dir}: {str(e)}")
+        return removed
@@ -1,64 +1,123 @@
-import yfinance as yf
-import requests
-from typing import List, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Dict, Any, Tuple
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
 import logging
+import math
 from ...domain.entities.stock import Stock
+from .file_cache import FileSystemCache
 
 logger = logging.getLogger(__name__)
 
+# Major Japanese stocks (Nikkei 225 components)
+_MAJOR_JP_SYMBOLS = (
+    "7203",  # Toyota Motor
+    "6758",  # Sony Group
+    "9984",  # SoftBank Group
+    "8306",  # Mitsubishi UFJ Financial Group
+    "4502",  # Takeda Pharmaceutical
+    "6861",  # Keyence
+    "9432",  # NTT
+    "4612",  # Nippon Paint Holdings
+    "7974",  # Nintendo
+    "6367",  # Daikin Industries
+)
+
+_HEALTH_CHECK_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+
+# Part of every cache key; bump when the cached value layout changes so old entries are ignored
+_CACHE_FORMAT = "v3"
+
+
+def _with_suffix(symbol: str) -> str:
+    """Add .T suffix for Tokyo Stock Exchange if not present."""
+    return symbol if symbol.endswith('.T') else f"{symbol}.T"
+
+
+def _to_decimal(value) -> Decimal:
+    """Convert a float or NumPy scalar to the Decimal of its shortest repr."""
+    # float() first: str() on a NumPy scalar goes through NumPy's slower formatter
+    return Decimal(repr(float(value)))
+
+
+def _to_volume(volume) -> Optional[int]:
+    """Convert a volume cell to int, treating zero and NaN as missing."""
+    return int(volume) if volume and not math.isnan(volume) else None
+
+
+def _build_stock(symbol_with_suffix: str, close, previous_close, volume,
+                 info: Dict[str, Any], fallback_name: str, last_updated: datetime) -> Stock:
+    """Build a Stock from the latest session values and (possibly empty) company info."""
+    # Extract company information
+    company_name = info.get('longName') or info.get('shortName') or fallback_name
+    
+    return Stock(
+        symbol=symbol_with_suffix,
+        name=company_name,
+        current_price=_to_decimal(close),
+        previous_close=_to_decimal(previous_close),
+        volume=_to_volume(volume),
+        market_cap=info.get('marketCap'),
+        pe_ratio=_to_decimal(info['trailingPE']) if info.get('trailingPE') else None,
+        dividend_yield=_to_decimal(info['dividendYield'] * 100) if info.get('dividendYield') else None,
+        last_updated=last_updated
+    )
+
+
+def _latest_sessions(hist) -> Tuple[float, float, float]:
+    """Return (close, previous_close, volume) of a price history frame as plain floats."""
+    # Slice the last two sessions once; with a single row both closes are the same
+    recent = hist.iloc[-2:]
+    closes = recent['Close'].to_numpy()
+    volume = recent['Volume'].to_numpy()[-1]
+    return float(closes[-1]), float(closes[0]), float(volume)
+
 
 class YahooFinanceCollector:
     """Data collector for Yahoo Finance Japan stock data."""
     
-    def __init__(self, timeout: int = 30, max_retries: int = 3):
+    def __init__(self, timeout: int = 30, max_retries: int = 3, max_workers: int = 8,
+                 cache: Optional[FileSystemCache] = None, use_cache: bool = True):
         self.timeout = timeout
         self.max_retries = max_retries
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.max_workers = max_workers
+        if use_cache:
+            self.cache = cache if cache is not None else FileSystemCache()
+        else:
+            self.cache = None
     
-    def collect_stock_data(self, symbol: str) -> Optional[Stock]:
-        """Collect data for a single stock symbol."""
+    def collect_stock_data(self, symbol: str, force_refresh: bool = False) -> Optional[Stock]:
+        """Collect data for a single stock symbol, using the on-disk cache (if enabled) unless force_refresh is set."""
         try:
-            # Add .T suffix for Tokyo Stock Exchange if not present
-            if not symbol.endswith('.T'):
-                symbol_with_suffix = f"{symbol}.T"
-            else:
-                symbol_with_suffix = symbol
-            
-            logger.info(f"Collecting data for {symbol_with_suffix}")
-            
-            # Use yfinance to get stock data
-            ticker = yf.Ticker(symbol_with_suffix)
-            info = ticker.info
-            hist = ticker.history(period="5d")
-            
-            if hist.empty:
-                logger.warning(f"No historical data found for {symbol_with_suffix}")
-                return None
-            
-            # Get the most recent data
-            latest_data = hist.iloc[-1]
-            previous_close = hist.iloc[-2]['Close'] if len(hist) > 1 else latest_data['Close']
+            symbol_with_suffix = _with_suffix(symbol)
+            cache_key = (symbol_with_suffix, "5d", date.today().isoformat(), _CACHE_FORMAT)
+            cached = None if force_refresh or self.cache is None else self.cache.get(cache_key)
             
-            # Extract company information
-            company_name = info.get('longName') or info.get('shortName') or symbol
+            if cached is not None:
+                logger.info(f"Using cached data for {symbol_with_suffix}")
+                fetched_at, sessions, info = cached
+            else:
+                logger.info(f"Collecting data for {symbol_with_suffix}")
+                
+                # Use yfinance to get stock data (imported lazily: it pulls in pandas)
+                import yfinance as yf
+                ticker = yf.Ticker(symbol_with_suffix)
+                info = ticker.info
+                hist = ticker.history(period="5d")
+                fetched_at = datetime.now()
+                
+                if hist.empty:
+                    logger.warning(f"No historical data found for {symbol_with_suffix}")
+                    return None
+                
+                # Cache plain floats rather than the frame, so a hit never imports pandas
+                sessions = _latest_sessions(hist)
+                if self.cache is not None:
+                    self.cache.set(cache_key, (fetched_at, sessions, info))
             
-            # Create Stock entity
-            stock = Stock(
-                symbol=symbol_with_suffix,
-                name=company_name,
-                current_price=Decimal(str(latest_data['Close'])),
-                previous_close=Decimal(str(previous_close)),
-                volume=int(latest_data['Volume']) if latest_data['Volume'] else None,
-                market_cap=info.get('marketCap'),
-                pe_ratio=Decimal(str(info['trailingPE'])) if info.get('trailingPE') else None,
-                dividend_yield=Decimal(str(info['dividendYield'] * 100)) if info.get('dividendYield') else None,
-                last_updated=datetime.now()
-            )
+            # A cache hit keeps the original fetch time, so stored rows are not dated as fresh
+            close, previous_close, volume = sessions
+            stock = _build_stock(symbol_with_suffix, close, previous_close, volume, info, symbol, fetched_at)
             
             logger.info(f"Successfully collected data for {stock.name}")
             return stock
@@ -67,45 +126,101 @@ class YahooFinanceCollector:
             logger.error(f"Error collecting data for {symbol}: {str(e)}")
             return None
     
-    def collect_multiple_stocks(self, symbols: List[str]) -> List[Stock]:
-        """Collect data for multiple stock symbols."""
-        stocks = []
+    def collect_multiple_stocks(self, symbols: List[str],
+                                on_done: Optional[Callable[[str, Optional[Stock]], None]] = None) -> List[Stock]:
+        """Collect data for multiple stock symbols concurrently, preserving input order.
+        
+        on_done, if given, is called with each symbol and its stock (None on
+        failure) as fetches complete, from the calling thread.
+        """
+        if not symbols:
+            return []
+        
+        # Each fetch is a blocking HTTPS round trip, so threads overlap the waits
+        workers = min(self.max_workers, len(symbols))
+        results: List[Optional[Stock]] = [None] * len(symbols)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.collect_stock_data, symbol): index
+                for index, symbol in enumerate(symbols)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                if on_done:
+                    on_done(symbols[index], results[index])
+        stocks = [stock for stock in results if stock]
+        
+        logger.info(f"Successfully collected data for {len(stocks)}/{len(symbols)} stocks")
+        return stocks
+    
+    def collect_multiple_stocks_batch(self, symbols: List[str]) -> List[Stock]:
+        """Collect data for multiple stock symbols with one batched history download.
+        
+        Company info is not fetched, so names fall back to the symbol and
+        market cap, P/E and dividend yield are left empty.
+        """
+        if not symbols:
+            return []
         
-        for symbol in symbols:
-            stock = self.collect_stock_data(symbol)
-            if stock:
-                stocks.append(stock)
+        suffixed = [_with_suffix(symbol) for symbol in symbols]
+        try:
+            import yfinance as yf
+            data = yf.download(
+                tickers=suffixed, period="5d", group_by='ticker',
+                threads=True, progress=False
+            )
+        except Exception as e:
+            logger.error(f"Error downloading batch data for {len(suffixed)} symbols: {str(e)}")
+            return []
+        
+        # Reshape to one (date, ticker)-indexed frame and keep each ticker's last
+        # two traded sessions; NaN closes are dates another ticker traded on
+        sessions: Dict[str, list] = {}
+        try:
+            if not data.empty:
+                rows = data.stack(level=0, future_stack=True).dropna(subset=['Close'])
+                recent = rows.groupby(level=1, sort=False).tail(2)
+                for ticker, close, volume in zip(recent.index.get_level_values(1),
+                                                 recent['Close'].to_numpy(),
+                                                 recent['Volume'].to_numpy()):
+                    sessions.setdefault(ticker, []).append((close, volume))
+        except Exception as e:
+            logger.error(f"Error reading batch data for {len(suffixed)} symbols: {str(e)}")
+            return []
+        
+        fetched_at = datetime.now()
+        stocks = []
+        for symbol, symbol_with_suffix in zip(symbols, suffixed):
+            ticker_sessions = sessions.get(symbol_with_suffix)
+            if not ticker_sessions:
+                logger.warning(f"No historical data found for {symbol_with_suffix}")
+                continue
+            try:
+                (previous_close, _), (close, volume) = ticker_sessions[0], ticker_sessions[-1]
+                stocks.append(_build_stock(symbol_with_suffix, close, previous_close, volume, {}, symbol, fetched_at))
+            except Exception as e:
+                logger.error(f"Error collecting data for {symbol}: {str(e)}")
         
         logger.info(f"Successfully collected data for {len(stocks)}/{len(symbols)} stocks")
         return stocks
     
     def get_major_japanese_stocks(self) -> List[str]:
         """Get list of major Japanese stock symbols."""
-        # Major Japanese stocks (Nikkei 225 components)
-        return [
-            "7203",  # Toyota Motor
-            "6758",  # Sony Group
-            "9984",  # SoftBank Group
-            "8306",  # Mitsubishi UFJ Financial Group
-            "4502",  # Takeda Pharmaceutical
-            "6861",  # Keyence
-            "9432",  # NTT
-            "4612",  # Nippon Paint Holdings
-            "7974",  # Nintendo
-            "6367",  # Daikin Industries
-        ]
+        return list(_MAJOR_JP_SYMBOLS)
     
-    def collect_major_stocks(self) -> List[Stock]:
+    def collect_major_stocks(self, on_done: Optional[Callable[[str, Optional[Stock]], None]] = None) -> List[Stock]:
         """Collect data for major Japanese stocks."""
         symbols = self.get_major_japanese_stocks()
-        return self.collect_multiple_stocks(symbols)
+        return self.collect_multiple_stocks(symbols, on_done)
     
     def health_check(self) -> bool:
         """Check if the data source is accessible."""
         try:
-            # Try to fetch data for Toyota as a health check
-            stock = self.collect_stock_data("7203")
-            return stock is not None
+            import requests
+            # One HEAD round trip; any non-5xx answer means Yahoo Finance is reachable
+            response = requests.head(_HEALTH_CHECK_URL, timeout=self.timeout)
+            return response.status_code < 500
         except Exception as e:
             logger.error(f"Health check failed: {str(e)}")
-            return False
\ No newline at end of file
+            return False
@@ -1,41 +1,278 @@
 import sqlite3
-from typing import List, Optional
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from datetime import datetime, timedelta
+from decimal import Decimal
 import json
 import logging
+import msgspec
 from ...domain.entities.stock import Stock
 from ...domain.entities.analysis import Analysis
 from ...domain.entities.summary import Summary
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# orjson is an optional speedup; stored text stays plain JSON either way
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def _json_dumps(value: Any) -> str:
+        return orjson.dumps(value, option=_ORJSON_OPTIONS).decode()
+    
+    _json_loads = orjson.loads
+else:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+# Per-connection tuning: WAL journal with relaxed fsync, in-memory temp
+# tables, 64 MiB page cache and 256 MiB memory-mapped I/O
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Summary collections are stored as MessagePack BLOBs
+_msgpack_encoder = msgspec.msgpack.Encoder()
+_msgpack_decoder = msgspec.msgpack.Decoder()
+
+
+def _decode_collection(value: Any, default: Any) -> Any:
+    """Decode a MessagePack BLOB, or a JSON TEXT value written before the BLOB layout."""
+    if not value:
+        return default
+    if isinstance(value, bytes):
+        return _msgpack_decoder.decode(value)
+    if isinstance(value, str):
+        return _json_loads(value)
+    return default
+
+
+# Bumped whenever init_database needs to migrate existing tables
+_SCHEMA_VERSION = 1
+
+# Monetary Decimal fields are stored as TEXT so they round-trip exactly
+_CREATE_STOCKS_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        symbol TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        current_price TEXT,
+        previous_close TEXT,
+        volume INTEGER,
+        market_cap INTEGER,
+        pe_ratio TEXT,
+        dividend_yield TEXT,
+        last_updated TEXT NOT NULL
+    )
+"""
+
+# Rows per executemany call for bulk writes
+_BULK_CHUNK_SIZE = 10_000
+
+# Symbols per IN (...) lookup, well under SQLite's bound-parameter limit
+_QUERY_CHUNK_SIZE = 500
+
+_UPSERT_STOCK_SQL = """
+    INSERT OR REPLACE INTO stocks 
+    (symbol, name, current_price, previous_close, volume, market_cap, 
+     pe_ratio, dividend_yield, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _decimal_text(value: Optional[Decimal]) -> Optional[str]:
+    """Serialize a Decimal losslessly for a TEXT column."""
+    return str(value) if value is not None else None
+
+
+def _stock_row(stock: Stock) -> tuple:
+    """Convert a stock into a parameter tuple for _UPSERT_STOCK_SQL."""
+    return (
+        stock.symbol,
+        stock.name,
+        _decimal_text(stock.current_price),
+        _decimal_text(stock.previous_close),
+        stock.volume,
+        stock.market_cap,
+        _decimal_text(stock.pe_ratio),
+        _decimal_text(stock.dividend_yield),
+        stock.last_updated.isoformat()
+    )
+
+
+_INSERT_ANALYSIS_SQL = """
+    INSERT INTO analysis 
+    (stock_symbol, analysis_date, trend_direction, volatility,
+     moving_average_5d, moving_average_20d, rsi, valuation_score,
+     growth_potential, risk_level, risk_factors, daily_return,
+     weekly_return, monthly_return, beta, sharpe_ratio, raw_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _analysis_row(analysis: Analysis) -> tuple:
+    """Convert an analysis into a parameter tuple for _INSERT_ANALYSIS_SQL."""
+    return (
+        analysis.stock_symbol,
+        analysis.analysis_date.isoformat(),
+        analysis.trend_direction.value if analysis.trend_direction else None,
+        float(analysis.volatility) if analysis.volatility else None,
+        float(analysis.moving_average_5d) if analysis.moving_average_5d else None,
+        float(analysis.moving_average_20d) if analysis.moving_average_20d else None,
+        float(analysis.rsi) if analysis.rsi else None,
+        analysis.valuation_score,
+        analysis.growth_potential,
+        analysis.risk_level.value if analysis.risk_level else None,
+        _json_dumps(analysis.risk_factors),
+        float(analysis.daily_return) if analysis.daily_return else None,
+        float(analysis.weekly_return) if analysis.weekly_return else None,
+        float(analysis.monthly_return) if analysis.monthly_return else None,
+        float(analysis.beta) if analysis.beta else None,
+        float(analysis.sharpe_ratio) if analysis.sharpe_ratio else None,
+        _json_dumps(analysis.raw_data)
+    )
+
+
+_ANALYSIS_COLUMNS = """
+    stock_symbol, analysis_date, trend_direction, volatility,
+    moving_average_5d, moving_average_20d, rsi, valuation_score,
+    growth_potential, risk_level, risk_factors, daily_return,
+    weekly_return, monthly_return, beta, sharpe_ratio, raw_data
+"""
+
+
+def _analysis_from_row(row: sqlite3.Row) -> Analysis:
+    """Build an Analysis from a row selecting _ANALYSIS_COLUMNS."""
+    return Analysis(
+        stock_symbol=row["stock_symbol"],
+        analysis_date=datetime.fromisoformat(row["analysis_date"]),
+        trend_direction=row["trend_direction"],
+        volatility=row["volatility"],
+        moving_average_5d=row["moving_average_5d"],
+        moving_average_20d=row["moving_average_20d"],
+        rsi=row["rsi"],
+        valuation_score=row["valuation_score"],
+        growth_potential=row["growth_potential"],
+        risk_level=row["risk_level"],
+        risk_factors=_json_loads(row["risk_factors"]) if row["risk_factors"] else [],
+        daily_return=row["daily_return"],
+        weekly_return=row["weekly_return"],
+        monthly_return=row["monthly_return"],
+        beta=row["beta"],
+        sharpe_ratio=row["sharpe_ratio"],
+        raw_data=_json_loads(row["raw_data"]) if row["raw_data"] else {}
+    )
+
+
+_UPSERT_SUMMARY_SQL = """
+    INSERT OR REPLACE INTO summaries 
+    (id, summary_type, title, created_at, executive_summary,
+     detailed_analysis, key_metrics, insights, recommendations,
+     stocks_analyzed, analysis_period, confidence_score,
+     charts_data, tags)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _summary_row(summary: Summary) -> tuple:
+    """Convert a summary into a parameter tuple for _UPSERT_SUMMARY_SQL."""
+    return (
+        summary.id,
+        summary.summary_type.value,
+        summary.title,
+        summary.created_at.isoformat(),
+        summary.executive_summary,
+        summary.detailed_analysis,
+        _msgpack_encoder.encode(summary.key_metrics),
+        _msgpack_encoder.encode([insight.model_dump() for insight in summary.insights]),
+        _msgpack_encoder.encode(summary.recommendations),
+        _msgpack_encoder.encode(summary.stocks_analyzed),
+        summary.analysis_period,
+        summary.confidence_score,
+        _msgpack_encoder.encode(summary.charts_data),
+        _msgpack_encoder.encode(summary.tags)
+    )
+
+
+_SELECT_STOCKS_SQL = """
+    SELECT symbol, name, current_price, previous_close, volume, 
+           market_cap, pe_ratio, dividend_yield, last_updated
+    FROM stocks
+"""
+
+
+def _stock_from_row(row: sqlite3.Row) -> Stock:
+    """Build a Stock from a row selected by _SELECT_STOCKS_SQL."""
+    return Stock(
+        symbol=row["symbol"],
+        name=row["name"],
+        current_price=row["current_price"],
+        previous_close=row["previous_close"],
+        volume=row["volume"],
+        market_cap=row["market_cap"],
+        pe_ratio=row["pe_ratio"],
+        dividend_yield=row["dividend_yield"],
+        last_updated=datetime.fromisoformat(row["last_updated"])
+    )
+
 
 class SQLiteRepository:
     """SQLite repository for storing stock data, analysis, and summaries."""
     
     def __init__(self, db_path: str = "stock_data.db"):
         self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = self._connect()
         self.init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open the shared connection with the tuned PRAGMAs applied."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """Run the enclosed writes in one transaction; nested calls join the outer one.
+        
+        With immediate=True the write lock is taken up front (BEGIN IMMEDIATE), so a
+        concurrent writer makes this wait at BEGIN instead of failing mid-batch.
+        """
+        with self._lock:
+            conn = self._conn
+            if conn.in_transaction:
+                yield conn
+                return
+            
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+    
+    def close(self):
+        """Close the shared database connection."""
+        self._conn.close()
+    
     def init_database(self):
         """Initialize database tables."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             
             # Create stocks table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS stocks (
-                    symbol TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    current_price REAL,
-                    previous_close REAL,
-                    volume INTEGER,
-                    market_cap INTEGER,
-                    pe_ratio REAL,
-                    dividend_yield REAL,
-                    last_updated TEXT NOT NULL
-                )
-            """)
+            cursor.execute(_CREATE_STOCKS_SQL.format(table="stocks"))
             
             # Create analysis table
             cursor.execute("""
@@ -71,42 +308,57 @@ class SQLiteRepository:
                     created_at TEXT NOT NULL,
                     executive_summary TEXT NOT NULL,
                     detailed_analysis TEXT NOT NULL,
-                    key_metrics TEXT,
-                    insights TEXT,
-                    recommendations TEXT,
-                    stocks_analyzed TEXT,
+                    key_metrics BLOB,
+                    insights BLOB,
+                    recommendations BLOB,
+                    stocks_analyzed BLOB,
                     analysis_period TEXT NOT NULL,
                     confidence_score REAL,
-                    charts_data TEXT,
-                    tags TEXT
+                    charts_data BLOB,
+                    tags BLOB
                 )
             """)
             
-            conn.commit()
+            # Indices for latest-first summary listing and per-symbol analysis lookups
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_summaries_created
+                ON summaries (created_at DESC)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_analysis_symbol_date
+                ON analysis (stock_symbol, analysis_date DESC)
+            """)
+            
+            if cursor.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+                self._migrate_stock_decimals_to_text(cursor)
+                cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            
             logger.info("Database initialized successfully")
     
+    def _migrate_stock_decimals_to_text(self, cursor: sqlite3.Cursor):
+        """Rebuild a legacy stocks table whose Decimal columns were REAL."""
+        columns = {row["name"]: row["type"] for row in cursor.execute("PRAGMA table_info(stocks)")}
+        if columns.get("current_price") != "REAL":
+            return
+        
+        cursor.execute(_CREATE_STOCKS_SQL.format(table="stocks_migrated"))
+        cursor.execute("""
+            INSERT INTO stocks_migrated
+            SELECT symbol, name, CAST(current_price AS TEXT), CAST(previous_close AS TEXT),
+                   volume, market_cap, CAST(pe_ratio AS TEXT), CAST(dividend_yield AS TEXT),
+                   last_updated
+            FROM stocks
+        """)
+        cursor.execute("DROP TABLE stocks")
+        cursor.execute("ALTER TABLE stocks_migrated RENAME TO stocks")
+        logger.info("Migrated stocks table to TEXT Decimal columns")
+    
     def save_stock(self, stock: Stock) -> bool:
         """Save or update a stock record."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.transaction() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR REPLACE INTO stocks 
-                    (symbol, name, current_price, previous_close, volume, market_cap, 
-                     pe_ratio, dividend_yield, last_updated)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    stock.symbol,
-                    stock.name,
-                    float(stock.current_price) if stock.current_price else None,
-                    float(stock.previous_close) if stock.previous_close else None,
-                    stock.volume,
-                    stock.market_cap,
-                    float(stock.pe_ratio) if stock.pe_ratio else None,
-                    float(stock.dividend_yield) if stock.dividend_yield else None,
-                    stock.last_updated.isoformat()
-                ))
-                conn.commit()
+                cursor.execute(_UPSERT_STOCK_SQL, _stock_row(stock))
                 logger.info(f"Saved stock data for {stock.symbol}")
                 return True
         except Exception as e:
@@ -114,180 +366,147 @@ class SQLiteRepository:
             return False
     
     def save_stocks(self, stocks: List[Stock]) -> int:
-        """Save multiple stocks and return count of successfully saved."""
-        saved_count = 0
-        for stock in stocks:
-            if self.save_stock(stock):
-                saved_count += 1
-        return saved_count
+        """Save multiple stocks in one transaction and return count of successfully saved."""
+        return self._save_many(_UPSERT_STOCK_SQL, stocks, _stock_row, "stock")
     
     def get_stock(self, symbol: str) -> Optional[Stock]:
         """Retrieve a stock by symbol."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT symbol, name, current_price, previous_close, volume, 
-                           market_cap, pe_ratio, dividend_yield, last_updated
-                    FROM stocks WHERE symbol = ?
-                """, (symbol,))
-                
-                row = cursor.fetchone()
-                if row:
-                    return Stock(
-                        symbol=row[0],
-                        name=row[1],
-                        current_price=row[2],
-                        previous_close=row[3],
-                        volume=row[4],
-                        market_cap=row[5],
-                        pe_ratio=row[6],
-                        dividend_yield=row[7],
-                        last_updated=datetime.fromisoformat(row[8])
-                    )
-                return None
+            row = self._conn.execute(
+                f"{_SELECT_STOCKS_SQL} WHERE symbol = ?", (symbol,)
+            ).fetchone()
+            return _stock_from_row(row) if row else None
         except Exception as e:
             logger.error(f"Error retrieving stock {symbol}: {str(e)}")
             return None
     
+    def get_all_stocks_iter(self) -> Iterator[Stock]:
+        """Yield all stocks ordered by name, streaming rows from the cursor."""
+        for row in self._conn.execute(f"{_SELECT_STOCKS_SQL} ORDER BY name"):
+            yield _stock_from_row(row)
+    
     def get_all_stocks(self) -> List[Stock]:
         """Retrieve all stocks."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT symbol, name, current_price, previous_close, volume, 
-                           market_cap, pe_ratio, dividend_yield, last_updated
-                    FROM stocks ORDER BY name
-                """)
-                
-                stocks = []
-                for row in cursor.fetchall():
-                    stock = Stock(
-                        symbol=row[0],
-                        name=row[1],
-                        current_price=row[2],
-                        previous_close=row[3],
-                        volume=row[4],
-                        market_cap=row[5],
-                        pe_ratio=row[6],
-                        dividend_yield=row[7],
-                        last_updated=datetime.fromisoformat(row[8])
-                    )
-                    stocks.append(stock)
-                
-                return stocks
+            return list(self.get_all_stocks_iter())
         except Exception as e:
             logger.error(f"Error retrieving all stocks: {str(e)}")
             return []
     
+    def get_stocks(self, limit: Optional[int] = None, offset: int = 0) -> List[Stock]:
+        """Retrieve one page of stocks ordered by name; a limit of None returns the rest."""
+        try:
+            # LIMIT -1 is sqlite's "no limit"; ordering by name keeps pages aligned with get_all_stocks
+            cursor = self._conn.execute(
+                f"{_SELECT_STOCKS_SQL} ORDER BY name LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset)
+            )
+            return [_stock_from_row(row) for row in cursor]
+        except Exception as e:
+            logger.error(f"Error retrieving stocks: {str(e)}")
+            return []
+    
+    def count_stocks(self) -> int:
+        """Count stored stocks without loading them."""
+        try:
+            return self._conn.execute("SELECT COUNT(*) FROM stocks").fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error counting stocks: {str(e)}")
+            return 0
+    
     def save_analysis(self, analysis: Analysis) -> bool:
         """Save analysis data."""
+        return self.save_analyses([analysis]) == 1
+    
+    def save_analyses(self, analyses: List[Analysis]) -> int:
+        """Save multiple analyses in one transaction and return count of successfully saved."""
+        return self._save_many(_INSERT_ANALYSIS_SQL, analyses, _analysis_row, "analysis")
+    
+    def get_latest_analysis(self, symbol: str, max_age: timedelta = timedelta(hours=1)) -> Optional[Analysis]:
+        """Get the newest analysis for a symbol if it is younger than max_age."""
+        return self.get_latest_analyses([symbol], max_age).get(symbol)
+    
+    def get_latest_analyses(self, symbols: List[str],
+                            max_age: timedelta = timedelta(hours=1)) -> Dict[str, Analysis]:
+        """Get the newest analysis per symbol, skipping symbols with none younger than max_age."""
+        cutoff = (datetime.now() - max_age).isoformat()
+        latest = {}
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO analysis 
-                    (stock_symbol, analysis_date, trend_direction, volatility,
-                     moving_average_5d, moving_average_20d, rsi, valuation_score,
-                     growth_potential, risk_level, risk_factors, daily_return,
-                     weekly_return, monthly_return, beta, sharpe_ratio, raw_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    analysis.stock_symbol,
-                    analysis.analysis_date.isoformat(),
-                    analysis.trend_direction.value if analysis.trend_direction else None,
-                    float(analysis.volatility) if analysis.volatility else None,
-                    float(analysis.moving_average_5d) if analysis.moving_average_5d else None,
-                    float(analysis.moving_average_20d) if analysis.moving_average_20d else None,
-                    float(analysis.rsi) if analysis.rsi else None,
-                    analysis.valuation_score,
-                    analysis.growth_potential,
-                    analysis.risk_level.value if analysis.risk_level else None,
-                    json.dumps(analysis.risk_factors),
-                    float(analysis.daily_return) if analysis.daily_return else None,
-                    float(analysis.weekly_return) if analysis.weekly_return else None,
-                    float(analysis.monthly_return) if analysis.monthly_return else None,
-                    float(analysis.beta) if analysis.beta else None,
-                    float(analysis.sharpe_ratio) if analysis.sharpe_ratio else None,
-                    json.dumps(analysis.raw_data)
-                ))
-                conn.commit()
-                logger.info(f"Saved analysis for {analysis.stock_symbol}")
-                return True
+            for start in range(0, len(symbols), _QUERY_CHUNK_SIZE):
+                chunk = symbols[start:start + _QUERY_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                # SQLite fills the bare columns from the row holding MAX(analysis_date)
+                cursor = self._conn.execute(f"""
+                    SELECT {_ANALYSIS_COLUMNS}, MAX(analysis_date)
+                    FROM analysis
+                    WHERE stock_symbol IN ({placeholders}) AND analysis_date >= ?
+                    GROUP BY stock_symbol
+                """, (*chunk, cutoff))
+                for row in cursor:
+                    latest[row["stock_symbol"]] = _analysis_from_row(row)
+            return latest
         except Exception as e:
-            logger.error(f"Error saving analysis for {analysis.stock_symbol}: {str(e)}")
-            return False
+            logger.error(f"Error retrieving latest analyses: {str(e)}")
+            return {}
     
     def save_summary(self, summary: Summary) -> bool:
         """Save summary data."""
+        return self.save_summaries([summary]) == 1
+    
+    def save_summaries(self, summaries: List[Summary]) -> int:
+        """Save multiple summaries in one transaction and return count of successfully saved."""
+        return self._save_many(_UPSERT_SUMMARY_SQL, summaries, _summary_row, "summary")
+    
+    def _save_many(self, sql: str, items: list, to_row: Callable[[Any], tuple], label: str) -> int:
+        """Write items with one prepared statement reused across chunked executemany calls."""
+        if not items:
+            return 0
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT OR REPLACE INTO summaries 
-                    (id, summary_type, title, created_at, executive_summary,
-                     detailed_analysis, key_metrics, insights, recommendations,
-                     stocks_analyzed, analysis_period, confidence_score,
-                     charts_data, tags)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    summary.id,
-                    summary.summary_type.value,
-                    summary.title,
-                    summary.created_at.isoformat(),
-                    summary.executive_summary,
-                    summary.detailed_analysis,
-                    json.dumps(summary.key_metrics),
-                    json.dumps([insight.model_dump() for insight in summary.insights]),
-                    json.dumps(summary.recommendations),
-                    json.dumps(summary.stocks_analyzed),
-                    summary.analysis_period,
-                    summary.confidence_score,
-                    json.dumps(summary.charts_data),
-                    json.dumps(summary.tags)
-                ))
-                conn.commit()
-                logger.info(f"Saved summary: {summary.title}")
-                return True
+            rows = [to_row(item) for item in items]
+            with self.transaction(immediate=True) as conn:
+                for start in range(0, len(rows), _BULK_CHUNK_SIZE):
+                    conn.executemany(sql, rows[start:start + _BULK_CHUNK_SIZE])
+            logger.info(f"Saved {len(rows)} {label} record(s)")
+            return len(rows)
         except Exception as e:
-            logger.error(f"Error saving summary {summary.title}: {str(e)}")
-            return False
+            logger.error(f"Error saving {len(items)} {label} record(s): {str(e)}")
+            return 0
     
     def get_latest_summaries(self, limit: int = 10) -> List[Summary]:
         """Get the most recent summaries."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT id, summary_type, title, created_at, executive_summary,
-                           detailed_analysis, key_metrics, insights, recommendations,
-                           stocks_analyzed, analysis_period, confidence_score,
-                           charts_data, tags
-                    FROM summaries ORDER BY created_at DESC LIMIT ?
-                """, (limit,))
+            conn = self._conn
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT id, summary_type, title, created_at, executive_summary,
+                       detailed_analysis, key_metrics, insights, recommendations,
+                       stocks_analyzed, analysis_period, confidence_score,
+                       charts_data, tags
+                FROM summaries ORDER BY created_at DESC LIMIT ?
+            """, (limit,))
                 
-                summaries = []
-                for row in cursor.fetchall():
-                    summary = Summary(
-                        id=row[0],
-                        summary_type=row[1],
-                        title=row[2],
-                        created_at=datetime.fromisoformat(row[3]),
-                        executive_summary=row[4],
-                        detailed_analysis=row[5],
-                        key_metrics=json.loads(row[6]) if row[6] and isinstance(row[6], str) else {},
-                        insights=[],  # Would need to reconstruct Insight objects
-                        recommendations=json.loads(row[8]) if row[8] and isinstance(row[8], str) else [],
-                        stocks_analyzed=json.loads(row[9]) if row[9] and isinstance(row[9], str) else [],
-                        analysis_period=row[10],
-                        confidence_score=row[11] if isinstance(row[11], (int, float)) else None,
-                        charts_data=json.loads(row[12]) if row[12] and isinstance(row[12], str) else {},
-                        tags=json.loads(row[13]) if row[13] and isinstance(row[13], str) else []
-                    )
-                    summaries.append(summary)
+            summaries = []
+            for row in cursor.fetchall():
+                summary = Summary(
+                    id=row[0],
+                    summary_type=row[1],
+                    title=row[2],
+                    created_at=datetime.fromisoformat(row[3]),
+                    executive_summary=row[4],
+                    detailed_analysis=row[5],
+                    key_metrics=_decode_collection(row[6], {}),
+                    insights=_decode_collection(row[7], []),
+                    recommendations=_decode_collection(row[8], []),
+                    stocks_analyzed=_decode_collection(row[9], []),
+                    analysis_period=row[10],
+                    confidence_score=row[11] if isinstance(row[11], (int, float)) else None,
+                    charts_data=_decode_collection(row[12], {}),
+                    tags=_decode_collection(row[13], [])
+                )
+                summaries.append(summary)
                 
-                return summaries
+            return summaries
         except Exception as e:
             logger.error(f"Error retrieving summaries: {str(e)}")
             return []
\ No newline at end of file
@@ -1,43 +1,79 @@
 import click
 import logging
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
 from typing import List
 from datetime import datetime
 
-from ...infrastructure.data_sources import YahooFinanceCollector
-from ...infrastructure.storage import SQLiteRepository
-from ...application.services import SimpleAnalysisEngine, SummaryService
+logger = logging.getLogger(__name__)
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Display lookups keyed by enum value
+_RISK_COLORS = {'high': 'red', 'medium': 'yellow', 'low': 'green'}
+_TREND_SYMBOLS = {'up': '↑', 'down': '↓', 'sideways': '→'}
+_INSIGHT_COLORS = {'critical': 'red', 'warning': 'yellow', 'info': 'blue'}
 
-logger = logging.getLogger(__name__)
+# Seconds the health command waits for all of its probes
+_HEALTH_TIMEOUT = 10
+
+# requests applies its timeout to connect and read separately, so two of these fit the deadline
+_HEALTH_REQUEST_TIMEOUT = _HEALTH_TIMEOUT // 2
+
+# Below this many stocks, worker start-up costs more than it saves
+_MIN_PARALLEL_STOCKS = 4
+
+# Analysis engine of the current worker process, set by _init_analysis_worker
+_worker_engine = None
 
 
 @click.group()
-def cli():
+@click.option('--log-level', default='WARNING', show_default=True,
+              type=click.Choice(['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], case_sensitive=False),
+              help='Logging verbosity')
+@click.pass_context
+def cli(ctx, log_level):
     """Japanese Stock Information AI Agent CLI"""
-    pass
+    # Configured here rather than at import so --help exits without touching logging
+    logging.basicConfig(
+        level=getattr(logging, log_level.upper()),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    ctx.ensure_object(dict)
+
+
+def _get_repository(ctx: click.Context):
+    """Get the repository shared by this invocation, opening it on first use."""
+    repository = ctx.obj.get('repository')
+    if repository is None:
+        from ...infrastructure.storage import SQLiteRepository
+        repository = ctx.obj['repository'] = SQLiteRepository()
+        ctx.find_root().call_on_close(repository.close)
+    return repository
 
 
 @cli.command()
 @click.option('--symbols', default=None, help='Comma-separated stock symbols (e.g., 7203,6758)')
 @click.option('--major', is_flag=True, help='Use major Japanese stocks')
-def collect(symbols, major):
+@click.option('--no-cache', is_flag=True, help='Always fetch from Yahoo Finance, bypassing the on-disk cache')
+@click.pass_context
+def collect(ctx, symbols, major, no_cache):
     """Collect stock data from Yahoo Finance."""
-    collector = YahooFinanceCollector()
-    repository = SQLiteRepository()
+    from ...infrastructure.data_sources import YahooFinanceCollector
+    
+    collector = YahooFinanceCollector(use_cache=not no_cache)
+    repository = _get_repository(ctx)
     
     try:
         if major:
             click.echo("Collecting data for major Japanese stocks...")
-            stocks = collector.collect_major_stocks()
+            progress = _collect_progress(len(collector.get_major_japanese_stocks()))
+            stocks = collector.collect_major_stocks(on_done=progress)
         elif symbols:
             symbol_list = [s.strip() for s in symbols.split(',')]
             click.echo(f"Collecting data for: {', '.join(symbol_list)}")
-            stocks = collector.collect_multiple_stocks(symbol_list)
+            stocks = collector.collect_multiple_stocks(symbol_list, on_done=_collect_progress(len(symbol_list)))
         else:
             click.echo("Please specify --symbols or use --major flag")
             return
@@ -51,8 +87,9 @@ def collect(symbols, major):
         
         click.echo(f"Successfully collected and saved data for {saved_count}/{len(stocks)} stocks:")
         for stock in stocks:
-            change_symbol = "+" if stock.price_change_percent and stock.price_change_percent > 0 else ""
-            change_text = f"{change_symbol}{stock.price_change_percent:.2f}%" if stock.price_change_percent else "N/A"
+            change_percent = stock.price_change_percent
+            change_symbol = "+" if change_percent and change_percent > 0 else ""
+            change_text = f"{change_symbol}{change_percent:.2f}%" if change_percent else "N/A"
             click.echo(f"  {stock.name} ({stock.symbol}): ¥{stock.current_price} ({change_text})")
             
     except Exception as e:
@@ -63,9 +100,16 @@ def collect(symbols, major):
 @cli.command()
 @click.option('--symbol', help='Analyze specific stock symbol')
 @click.option('--all', 'analyze_all', is_flag=True, help='Analyze all stored stocks')
-def analyze(symbol, analyze_all):
+@click.option('--workers', default=1, show_default=True, type=click.IntRange(min=1),
+              help='Worker processes for --all analysis')
+@click.option('--limit', type=click.IntRange(min=1), help='Analyze at most this many stocks with --all')
+@click.option('--offset', default=0, type=click.IntRange(min=0), help='Skip this many stocks with --all')
+@click.pass_context
+def analyze(ctx, symbol, analyze_all, workers, limit, offset):
     """Analyze stock data and generate insights."""
-    repository = SQLiteRepository()
+    from ...application.services import SimpleAnalysisEngine
+    
+    repository = _get_repository(ctx)
     analysis_engine = SimpleAnalysisEngine()
     
     try:
@@ -82,25 +126,24 @@ def analyze(symbol, analyze_all):
             _display_stock_analysis(stock, analysis)
             
         elif analyze_all:
-            stocks = repository.get_all_stocks()
+            stocks = repository.get_stocks(limit, offset)
             if not stocks:
                 click.echo("No stocks found in database. Run 'collect' first.")
                 return
             
             click.echo(f"Analyzing {len(stocks)} stocks...")
-            analyses = analysis_engine.analyze_multiple_stocks(stocks)
-            
-            for analysis in analyses:
-                repository.save_analysis(analysis)
+            analyses = _analyze_stocks(analysis_engine, stocks, workers)
+            repository.save_analyses(analyses)
             
-            # Display summary
-            click.echo("\nAnalysis Summary:")
-            for i, (stock, analysis) in enumerate(zip(stocks, analyses)):
-                risk_color = "red" if analysis.risk_level and analysis.risk_level.value == 'high' else "yellow" if analysis.risk_level and analysis.risk_level.value == 'medium' else "green"
-                trend_symbol = "↑" if analysis.trend_direction and analysis.trend_direction.value == 'up' else "↓" if analysis.trend_direction and analysis.trend_direction.value == 'down' else "→"
+            # Display summary, written once
+            lines = ["\nAnalysis Summary:"]
+            for i, (stock, analysis) in enumerate(zip(stocks, analyses), offset + 1):
+                risk = analysis.risk_level.value if analysis.risk_level else 'unknown'
+                trend = analysis.trend_direction.value if analysis.trend_direction else None
+                risk_text = click.style(risk, fg=_RISK_COLORS.get(risk, 'green'))
                 
-                click.echo(f"  {i+1:2d}. {stock.name[:30]:30} {trend_symbol} Risk: ", nl=False)
-                click.secho(f"{analysis.risk_level.value if analysis.risk_level else 'unknown'}", fg=risk_color)
+                lines.append(f"  {i:2d}. {stock.name[:30]:30} {_TREND_SYMBOLS.get(trend, '→')} Risk: {risk_text}")
+            click.echo("\n".join(lines))
         else:
             click.echo("Please specify --symbol or use --all flag")
             
@@ -112,9 +155,12 @@ def analyze(symbol, analyze_all):
 @cli.command()
 @click.option('--type', 'summary_type', type=click.Choice(['daily', 'stock']), default='daily', help='Type of summary to generate')
 @click.option('--symbol', help='Stock symbol for individual stock summary')
-def summarize(summary_type, symbol):
+@click.pass_context
+def summarize(ctx, summary_type, symbol):
     """Generate summaries from analysis data."""
-    repository = SQLiteRepository()
+    from ...application.services import SimpleAnalysisEngine, SummaryService
+    
+    repository = _get_repository(ctx)
     summary_service = SummaryService()
     
     try:
@@ -124,9 +170,9 @@ def summarize(summary_type, symbol):
                 click.echo("No stocks found in database. Run 'collect' first.")
                 return
             
-            # For simplicity, create basic analyses if not available
+            # Reuse stored analyses and only analyze stocks without a current one
             analysis_engine = SimpleAnalysisEngine()
-            analyses = analysis_engine.analyze_multiple_stocks(stocks)
+            analyses = _latest_or_fresh_analyses(repository, analysis_engine, stocks)
             
             click.echo("Generating daily market overview...")
             summary = summary_service.generate_daily_overview(stocks, analyses)
@@ -145,7 +191,7 @@ def summarize(summary_type, symbol):
                 return
             
             analysis_engine = SimpleAnalysisEngine()
-            analysis = analysis_engine.analyze_stock(stock)
+            analysis = _latest_or_fresh_analyses(repository, analysis_engine, [stock])[0]
             
             click.echo(f"Generating summary for {stock.name}...")
             summary = summary_service.generate_stock_analysis_summary(stock, analysis)
@@ -159,25 +205,30 @@ def summarize(summary_type, symbol):
 
 
 @cli.command()
-def list_stocks():
+@click.option('--limit', type=click.IntRange(min=1), help='Show at most this many stocks')
+@click.option('--offset', default=0, type=click.IntRange(min=0), help='Skip this many stocks')
+@click.pass_context
+def list_stocks(ctx, limit, offset):
     """List all stored stocks."""
-    repository = SQLiteRepository()
+    repository = _get_repository(ctx)
     
     try:
-        stocks = repository.get_all_stocks()
+        stocks = repository.get_stocks(limit, offset)
         if not stocks:
             click.echo("No stocks found in database.")
             return
         
-        click.echo(f"\nStored Stocks ({len(stocks)}):")
-        click.echo("-" * 80)
-        
-        for i, stock in enumerate(stocks, 1):
-            change_symbol = "+" if stock.price_change_percent and stock.price_change_percent > 0 else ""
-            change_text = f"{change_symbol}{stock.price_change_percent:.2f}%" if stock.price_change_percent else "N/A"
-            updated = stock.last_updated.strftime("%Y-%m-%d %H:%M")
+        # Build the whole table and write it once
+        lines = [f"\nStored Stocks ({len(stocks)}):", "-" * 80]
+        for i, stock in enumerate(stocks, offset + 1):
+            change_percent = stock.price_change_percent
+            change_symbol = "+" if change_percent and change_percent > 0 else ""
+            change_text = f"{change_symbol}{change_percent:.2f}%" if change_percent else "N/A"
+            updated = stock.last_updated.isoformat(sep=' ', timespec='minutes')
             
-            click.echo(f"{i:2d}. {stock.name[:40]:40} ({stock.symbol:8}) ¥{stock.current_price:>8} ({change_text:>8}) [{updated}]")
+            lines.append(f"{i:2d}. {stock.name[:40]:40} ({stock.symbol:8}) ¥{stock.current_price:>8} ({change_text:>8}) [{updated}]")
+        
+        click.echo("\n".join(lines))
             
     except Exception as e:
         click.echo(f"Error listing stocks: {str(e)}")
@@ -185,9 +236,10 @@ def list_stocks():
 
 @cli.command()
 @click.option('--limit', default=5, help='Number of recent summaries to show')
-def history(limit):
+@click.pass_context
+def history(ctx, limit):
     """Show recent summaries."""
-    repository = SQLiteRepository()
+    repository = _get_repository(ctx)
     
     try:
         summaries = repository.get_latest_summaries(limit)
@@ -195,47 +247,137 @@ def history(limit):
             click.echo("No summaries found.")
             return
         
-        click.echo(f"\nRecent Summaries ({len(summaries)}):")
-        click.echo("-" * 80)
-        
+        # Build the whole listing and write it once
+        lines = [f"\nRecent Summaries ({len(summaries)}):", "-" * 80]
         for i, summary in enumerate(summaries, 1):
-            created_at = summary.created_at.strftime("%Y-%m-%d %H:%M")
-            click.echo(f"{i}. {summary.title} [{created_at}]")
-            click.echo(f"   Type: {summary.summary_type.value}, Stocks: {len(summary.stocks_analyzed)}")
-            click.echo(f"   {summary.executive_summary[:100]}...")
+            created_at = summary.created_at.isoformat(sep=' ', timespec='minutes')
+            lines.append(f"{i}. {summary.title} [{created_at}]")
+            lines.append(f"   Type: {summary.summary_type.value}, Stocks: {len(summary.stocks_analyzed)}")
+            lines.append(f"   {summary.executive_summary[:100]}...")
             if i < len(summaries):
-                click.echo()
+                lines.append("")
+        
+        click.echo("\n".join(lines))
                 
     except Exception as e:
         click.echo(f"Error retrieving history: {str(e)}")
 
 
 @cli.command()
-def health():
+@click.pass_context
+def health(ctx):
     """Check system health."""
     click.echo("Checking system health...")
     
-    # Check data source
-    collector = YahooFinanceCollector()
-    if collector.health_check():
-        click.secho("✓ Data source (Yahoo Finance): OK", fg="green")
-    else:
-        click.secho("✗ Data source (Yahoo Finance): FAILED", fg="red")
+    # Start the network probe first so it overlaps the local checks. It runs on a
+    # daemon thread, so a request still hanging at the deadline cannot delay exit
+    data_source = Future()
+    threading.Thread(target=_run_probe, args=(_probe_data_source, data_source), daemon=True).start()
+    deadline = time.monotonic() + _HEALTH_TIMEOUT
+    
+    # Local checks run on this thread: they never wait behind the network, and the
+    # context-owned repository is not used by a thread that can outlive the command
+    for label, probe in (("Database", partial(_probe_database, ctx)),
+                         ("Analysis engine", _probe_analysis_engine)):
+        result = Future()
+        _run_probe(probe, result)
+        _echo_probe(label, result, 0)
     
-    # Check database
+    _echo_probe("Data source (Yahoo Finance)", data_source, max(0.0, deadline - time.monotonic()))
+
+
+def _run_probe(probe, result: Future) -> None:
+    """Run a probe and record its detail text or error in result."""
     try:
-        repository = SQLiteRepository()
-        stocks = repository.get_all_stocks()
-        click.secho(f"✓ Database: OK ({len(stocks)} stocks stored)", fg="green")
+        result.set_result(probe())
     except Exception as e:
-        click.secho(f"✗ Database: FAILED ({str(e)})", fg="red")
-    
-    # Check analysis engine
+        result.set_exception(e)
+
+
+def _echo_probe(label: str, result: Future, timeout: float) -> None:
+    """Print one health line from a probe result, waiting at most timeout seconds."""
     try:
-        engine = SimpleAnalysisEngine()
-        click.secho("✓ Analysis engine: OK", fg="green")
+        detail = result.result(timeout=timeout)
+        click.secho(f"✓ {label}: OK{detail}", fg="green")
+    except FutureTimeoutError:
+        click.secho(f"✗ {label}: FAILED (timed out after {_HEALTH_TIMEOUT}s)", fg="red")
     except Exception as e:
-        click.secho(f"✗ Analysis engine: FAILED ({str(e)})", fg="red")
+        click.secho(f"✗ {label}: FAILED ({str(e)})", fg="red")
+
+
+def _probe_data_source() -> str:
+    """Check that Yahoo Finance answers."""
+    from ...infrastructure.data_sources import YahooFinanceCollector
+    
+    if not YahooFinanceCollector(timeout=_HEALTH_REQUEST_TIMEOUT).health_check():
+        raise RuntimeError("no response")
+    return ""
+
+
+def _probe_database(ctx: click.Context) -> str:
+    """Check that the database can be read."""
+    return f" ({_get_repository(ctx).count_stocks()} stocks stored)"
+
+
+def _probe_analysis_engine() -> str:
+    """Check that the analysis engine can be created."""
+    from ...application.services import SimpleAnalysisEngine
+    
+    SimpleAnalysisEngine()
+    return ""
+
+
+def _collect_progress(total: int):
+    """Build an on_done callback that echoes "[done/total] symbol: status" per fetch."""
+    done = 0
+    
+    def echo_progress(symbol: str, stock) -> None:
+        nonlocal done
+        done += 1
+        click.echo(f"  [{done}/{total}] {symbol}: {'OK' if stock else 'FAILED'}")
+    
+    return echo_progress
+
+
+def _init_analysis_worker():
+    """Create the analysis engine once per worker process."""
+    global _worker_engine
+    from ...application.services import SimpleAnalysisEngine
+    _worker_engine = SimpleAnalysisEngine()
+
+
+def _analyze_in_worker(stock):
+    """Analyze one stock with the worker's engine."""
+    return _worker_engine.analyze_stock(stock)
+
+
+def _analyze_stocks(analysis_engine, stocks: List, workers: int) -> List:
+    """Analyze stocks in order, spreading them over worker processes when worthwhile."""
+    if workers <= 1 or len(stocks) < _MIN_PARALLEL_STOCKS:
+        return analysis_engine.analyze_multiple_stocks_batched(stocks)
+    
+    chunksize = max(1, len(stocks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_analysis_worker) as executor:
+        return list(executor.map(_analyze_in_worker, stocks, chunksize=chunksize))
+
+
+def _latest_or_fresh_analyses(repository, analysis_engine, stocks: List) -> List:
+    """Get one analysis per stock, in order, reusing stored ones that are still current.
+    
+    A stored analysis is current if it is under an hour old and not older than the
+    stock data it was computed from; the rest are analyzed now and saved.
+    """
+    analyses = repository.get_latest_analyses([stock.symbol for stock in stocks])
+    missing = [
+        stock for stock in stocks
+        if stock.symbol not in analyses or analyses[stock.symbol].analysis_date < stock.last_updated
+    ]
+    if missing:
+        fresh = analysis_engine.analyze_multiple_stocks_batched(missing)
+        repository.save_analyses(fresh)
+        analyses.update((analysis.stock_symbol, analysis) for analysis in fresh)
+    
+    return [analyses[stock.symbol] for stock in stocks]
 
 
 def _display_stock_analysis(stock, analysis):
@@ -243,8 +385,9 @@ def _display_stock_analysis(stock, analysis):
     click.echo(f"\n=== Analysis for {stock.name} ===")
     
     # Basic info
-    change_symbol = "+" if stock.price_change_percent and stock.price_change_percent > 0 else ""
-    change_text = f"{change_symbol}{stock.price_change_percent:.2f}%" if stock.price_change_percent else "N/A"
+    change_percent = stock.price_change_percent
+    change_symbol = "+" if change_percent and change_percent > 0 else ""
+    change_text = f"{change_symbol}{change_percent:.2f}%" if change_percent else "N/A"
     click.echo(f"Price: ¥{stock.current_price} ({change_text})")
     
     if stock.pe_ratio:
@@ -254,18 +397,17 @@ def _display_stock_analysis(stock, analysis):
     
     # Analysis results
     if analysis.trend_direction:
-        trend_symbol = "↑" if analysis.trend_direction.value == 'up' else "↓" if analysis.trend_direction.value == 'down' else "→"
-        click.echo(f"Trend: {trend_symbol} {analysis.trend_direction.value}")
+        trend = analysis.trend_direction.value
+        click.echo(f"Trend: {_TREND_SYMBOLS.get(trend, '→')} {trend}")
     
-    if analysis.rsi:
-        rsi_color = "red" if analysis.rsi > 80 or analysis.rsi < 20 else "yellow" if analysis.rsi > 70 or analysis.rsi < 30 else "green"
-        click.echo(f"RSI: ", nl=False)
-        click.secho(f"{analysis.rsi}", fg=rsi_color)
+    rsi = analysis.rsi
+    if rsi:
+        rsi_color = "red" if rsi > 80 or rsi < 20 else "yellow" if rsi > 70 or rsi < 30 else "green"
+        click.echo(f"RSI: {click.style(str(rsi), fg=rsi_color)}")
     
     if analysis.risk_level:
-        risk_color = "red" if analysis.risk_level.value == 'high' else "yellow" if analysis.risk_level.value == 'medium' else "green"
-        click.echo(f"Risk Level: ", nl=False)
-        click.secho(f"{analysis.risk_level.value}", fg=risk_color)
+        risk = analysis.risk_level.value
+        click.echo(f"Risk Level: {click.style(risk, fg=_RISK_COLORS.get(risk, 'green'))}")
     
     if analysis.risk_factors:
         click.echo("Risk Factors:")
@@ -276,7 +418,7 @@ def _display_stock_analysis(stock, analysis):
 def _display_summary(summary):
     """Display summary information."""
     click.echo(f"\n=== {summary.title} ===")
-    click.echo(f"Created: {summary.created_at.strftime('%Y-%m-%d %H:%M')}")
+    click.echo(f"Created: {summary.created_at.isoformat(sep=' ', timespec='minutes')}")
     click.echo(f"Type: {summary.summary_type.value}")
     click.echo(f"Stocks: {len(summary.stocks_analyzed)}")
     
@@ -290,11 +432,9 @@ def _display_summary(summary):
     if summary.insights:
         click.echo(f"\nInsights ({len(summary.insights)}):")
         for insight in summary.insights:
-            level_color = "red" if insight.level.value == 'critical' else "yellow" if insight.level.value == 'warning' else "blue"
-            click.echo(f"  ", nl=False)
-            click.secho(f"[{insight.level.value.upper()}]", fg=level_color, nl=False)
-            click.echo(f" {insight.title}")
-            click.echo(f"    {insight.description}")
+            level = insight.level.value
+            level_text = click.style(f"[{level.upper()}]", fg=_INSIGHT_COLORS.get(level, 'blue'))
+            click.echo(f"  {level_text} {insight.title}\n    {insight.description}")
     
     if summary.recommendations:
         click.echo(f"\nRecommendations ({len(summary.recommendations)}):")